@@ -215,6 +215,9 @@ class BatchAgent(Agent, metaclass=ABCMeta):
             self, batch_obs, batch_reward, batch_done, batch_reset):
         """Observe a batch of action consequences for training.
 
+        The caller may reuse the same arrays of rewards, done flags and
+        reset flags for later steps, so copy them if they need to be kept.
+
         Args:
             batch_obs (Sequence of ~object): Observations.
             batch_reward (Sequence of float): Rewards.
@@ -24,10 +24,55 @@ class Env(object, metaclass=ABCMeta):
 class VectorEnv(object, metaclass=ABCMeta):
     """Parallel RL learning environments."""
 
+    _async_action = None
+    _async_reset_pending = False
+
     @abstractmethod
     def step(self, action):
         raise NotImplementedError()
 
+    def step_async(self, action):
+        """Start stepping envs without waiting for the results.
+
+        The results must be received by calling step_wait. By default, envs
+        are stepped synchronously when step_wait is called.
+
+        Args:
+            action (Sequence): Actions to take in envs.
+        """
+        self._async_action = action
+
+    def step_wait(self):
+        """Wait for the results of step_async.
+
+        Returns:
+            tuple: Same as the return value of step.
+        """
+        if self._async_action is None:
+            raise RuntimeError('step_wait is called before step_async')
+        action = self._async_action
+        self._async_action = None
+        return self.step(action)
+
+    def step_into(self, action, reward_out, done_out):
+        """Step envs, writing rewards and done flags into given arrays.
+
+        This lets the caller reuse the same arrays every step. Observations
+        are returned as usual because agents may keep references to them.
+
+        Args:
+            action (Sequence): Actions to take in envs.
+            reward_out (numpy.ndarray): Array that receives rewards.
+            done_out (numpy.ndarray): Array that receives done flags.
+
+        Returns:
+            tuple: Observations and infos.
+        """
+        obs, reward, done, info = self.step(action)
+        reward_out[:] = reward
+        done_out[:] = done
+        return obs, info
+
     @abstractmethod
     def reset(self, mask):
         """Reset envs.
@@ -38,6 +83,30 @@ class VectorEnv(object, metaclass=ABCMeta):
         """
         raise NotImplementedError()
 
+    def reset_async(self, mask=None):
+        """Start resetting envs without waiting for the observations.
+
+        The observations must be received by calling reset_wait. By default,
+        envs are reset synchronously when reset_wait is called.
+
+        Args:
+            mask (Sequence of bool): Mask array that specifies which env to
+                skip. If omitted, all the envs are reset.
+        """
+        self._async_reset_mask = mask
+        self._async_reset_pending = True
+
+    def reset_wait(self):
+        """Wait for the results of reset_async.
+
+        Returns:
+            Same as the return value of reset.
+        """
+        if not self._async_reset_pending:
+            raise RuntimeError('reset_wait is called before reset_async')
+        self._async_reset_pending = False
+        return self.reset(mask=self._async_reset_mask)
+
     @abstractmethod
     def seed(self, seeds):
         raise NotImplementedError()
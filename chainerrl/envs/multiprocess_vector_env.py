@@ -77,21 +77,47 @@ See https://github.com/numpy/numpy/issues/12793 for details.
         return spec
 
     def step(self, actions):
+        self.step_async(actions)
+        return self.step_wait()
+
+    def step_async(self, actions):
         self._assert_not_closed()
         for remote, action in zip(self.remotes, actions):
             remote.send(('step', action))
+
+    def step_wait(self):
+        self._assert_not_closed()
         results = [remote.recv() for remote in self.remotes]
         self.last_obs, rews, dones, infos = zip(*results)
         return self.last_obs, rews, dones, infos
 
+    def step_into(self, actions, rews_out, dones_out):
+        self.step_async(actions)
+        obs = []
+        infos = []
+        for i, remote in enumerate(self.remotes):
+            ob, rews_out[i], dones_out[i], info = remote.recv()
+            obs.append(ob)
+            infos.append(info)
+        self.last_obs = obs
+        return obs, infos
+
     def reset(self, mask=None):
+        self.reset_async(mask)
+        return self.reset_wait()
+
+    def reset_async(self, mask=None):
         self._assert_not_closed()
         if mask is None:
             mask = np.zeros(self.num_envs)
         for m, remote in zip(mask, self.remotes):
             if not m:
                 remote.send(('reset', None))
+        self._reset_mask = mask
 
+    def reset_wait(self):
+        self._assert_not_closed()
+        mask = self._reset_mask
         obs = [remote.recv() if not m else o for m, remote,
                o in zip(mask, self.remotes, self.last_obs)]
         self.last_obs = obs
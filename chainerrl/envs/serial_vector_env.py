@@ -25,6 +25,16 @@ class SerialVectorEnv(chainerrl.env.VectorEnv):
         self.last_obs, rews, dones, infos = zip(*results)
         return self.last_obs, rews, dones, infos
 
+    def step_into(self, actions, rews_out, dones_out):
+        obs = []
+        infos = []
+        for i, (env, a) in enumerate(zip(self.envs, actions)):
+            ob, rews_out[i], dones_out[i], info = env.step(a)
+            obs.append(ob)
+            infos.append(info)
+        self.last_obs = obs
+        return obs, infos
+
     def reset(self, mask=None):
         if mask is None:
             mask = np.zeros(self.num_envs)
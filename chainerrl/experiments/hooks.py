@@ -10,8 +10,16 @@ class StepHook(object, metaclass=ABCMeta):
     This class is for clarifying the interface required for Hook functions.
     You don't need to inherit this class to define your own hooks. Any callable
     that accepts (env, agent, step) as arguments can be used as a hook.
+
+    When used with batch training, a hook is called once per batch step with
+    the last timestep of the batch unless it has the attribute
+    `wants_every_step` set to True, in which case it is called for every
+    timestep. A hook can instead handle a batch step by itself by defining
+    `batch_call(env, agent, t_start, t_end)`. See BatchStepHook.
     """
 
+    wants_every_step = False
+
     @abstractmethod
     def __call__(self, env, agent, step):
         """Call the hook.
@@ -56,3 +64,45 @@ class LinearInterpolationHook(StepHook):
                           [1, self.total_steps],
                           [self.start_value, self.stop_value])
         self.setter(env, agent, value)
+
+    def batch_call(self, env, agent, t_start, t_end):
+        # Only the value at the last timestep matters
+        self(env, agent, t_end)
+
+
+class BatchStepHook(object):
+    """Adapter that calls a step hook for a range of timesteps.
+
+    Batch training advances multiple timesteps at once. This adapter calls
+    the wrapped hook only once with the last timestep of the range, which is
+    sufficient for most hooks and avoids calling every hook num_envs times
+    per batch step. If the wrapped hook has the attribute `wants_every_step`
+    set to True, it is called for every timestep in the range instead. If
+    the wrapped hook has the method `batch_call`, it is called with the
+    range and takes precedence over both.
+
+    Args:
+        hook (callable): Hook that accepts (env, agent, step) as arguments.
+    """
+
+    def __init__(self, hook):
+        self.hook = hook
+        self.batch_call = getattr(hook, 'batch_call', None)
+        self.wants_every_step = getattr(hook, 'wants_every_step', False)
+
+    def __call__(self, env, agent, t_start, t_end):
+        """Call the hook.
+
+        Args:
+            env: Environment.
+            agent: Agent.
+            t_start: Timestep before the batch step.
+            t_end: Timestep after the batch step.
+        """
+        if self.batch_call is not None:
+            self.batch_call(env, agent, t_start, t_end)
+        elif self.wants_every_step:
+            for step in range(t_start + 1, t_end + 1):
+                self.hook(env, agent, step)
+        else:
+            self.hook(env, agent, t_end)
@@ -1,12 +1,46 @@
-from collections import deque
 import logging
 import os
 
+from chainer import cuda
 import numpy as np
 
-
 from chainerrl.experiments.evaluator import Evaluator
 from chainerrl.experiments.evaluator import save_agent
+from chainerrl.experiments.hooks import BatchStepHook
+
+
+class _RecentReturns(object):
+    """Returns of the most recent episodes with O(1) mean computation.
+
+    Args:
+        maxlen (int): Maximum number of returns to keep.
+    """
+
+    def __init__(self, maxlen):
+        # Ring buffer whose oldest value is at self._head when it is full
+        self._returns = np.empty(maxlen, dtype=np.float32)
+        self._head = 0
+        self._len = 0
+        self._sum = 0.0
+
+    def __len__(self):
+        return self._len
+
+    def append(self, value):
+        if self._len == len(self._returns):
+            self._sum -= float(self._returns[self._head])
+        else:
+            self._len += 1
+        self._returns[self._head] = value
+        # Add the stored float32 value so that the sum stays consistent
+        self._sum += float(self._returns[self._head])
+        self._head = (self._head + 1) % len(self._returns)
+
+    def last(self):
+        return self._returns[self._head - 1]
+
+    def mean(self):
+        return self._sum / self._len
 
 
 def train_agent_batch(agent, env, steps, outdir,
@@ -31,24 +65,45 @@ def train_agent_batch(agent, env, steps, outdir,
         successful_score (float): Finish training if the mean score is greater
             or equal to thisvalue if not None
         step_hooks (Sequence): Sequence of callable objects that accepts
-            (env, agent, step) as arguments. They are called every step.
+            (env, agent, step) as arguments. They are called once every batch
+            step with the last timestep, or every timestep if they have the
+            attribute `wants_every_step` set to True.
             See chainerrl.experiments.hooks.
         logger (logging.Logger): Logger used in this function.
     """
 
     logger = logger or logging.getLogger(__name__)
-    recent_returns = deque(maxlen=return_window_size)
+    recent_returns = _RecentReturns(maxlen=return_window_size)
+    batch_step_hooks = [BatchStepHook(hook) for hook in step_hooks]
 
     num_envs = env.num_envs
-    episode_r = np.zeros(num_envs, dtype=np.float64)
-    episode_idx = np.zeros(num_envs, dtype='i')
+    episode_r = np.zeros(num_envs, dtype=np.float32)
     episode_len = np.zeros(num_envs, dtype='i')
+    # Buffers reused every step to avoid allocating temporary arrays
+    resets = np.zeros(num_envs, dtype=bool)
+    end = np.zeros(num_envs, dtype=bool)
+    not_end = np.zeros(num_envs, dtype=bool)
 
     # o_0, r_0
     obss = env.reset()
     rs = np.zeros(num_envs, dtype='f')
+    dones = np.zeros(num_envs, dtype=bool)
+    # Envs that support step_into write rewards and dones into rs and dones
+    use_step_into = hasattr(env, 'step_into')
 
     t = step_offset
+    total_episodes = 0
+    # Next timesteps at which checkpointing and logging are triggered. They
+    # are set to infinity when disabled so that the loop needs no checks.
+    if checkpoint_freq:
+        next_checkpoint_t = \
+            (step_offset // checkpoint_freq + 1) * checkpoint_freq
+    else:
+        next_checkpoint_t = float('inf')
+    if log_interval is not None:
+        next_log_t = (step_offset // log_interval + 1) * log_interval
+    else:
+        next_log_t = float('inf')
     if hasattr(agent, 't'):
         agent.t = step_offset
 
@@ -56,59 +111,88 @@ def train_agent_batch(agent, env, steps, outdir,
         while True:
             # a_t
             actions = agent.batch_act_and_train(obss)
+            if isinstance(actions, cuda.ndarray):
+                # Copy at once instead of syncing for every element
+                actions = cuda.to_cpu(actions)
             # o_{t+1}, r_{t+1}
-            obss, rs, dones, infos = env.step(actions)
+            if use_step_into:
+                obss, infos = env.step_into(actions, rs, dones)
+            else:
+                obss, rs, dones, infos = env.step(actions)
             episode_r += rs
             episode_len += 1
 
             # Compute mask for done and reset
+            needs_reset = [info.get('needs_reset', False) for info in infos]
             if max_episode_len is None:
-                resets = np.zeros(num_envs, dtype=bool)
+                resets[:] = needs_reset
             else:
-                resets = (episode_len == max_episode_len)
-            resets = np.logical_or(
-                resets, [info.get('needs_reset', False) for info in infos])
-            # Agent observes the consequences
-            agent.batch_observe_and_train(obss, rs, dones, resets)
+                np.equal(episode_len, max_episode_len, out=resets)
+                np.logical_or(resets, needs_reset, out=resets)
+            np.logical_or(resets, dones, out=end)
+            n_end = np.count_nonzero(end)
 
-            # Make mask. 0 if done/reset, 1 if pass
-            end = np.logical_or(resets, dones)
-            not_end = np.logical_not(end)
+            # Start new episodes if needed. Envs are reset while the agent
+            # is observing so that slow resets do not delay the next step.
+            # This is skipped when training is already finished.
+            resetting = n_end and t + num_envs < steps
+            if resetting:
+                # Make mask. 0 if done/reset, 1 if pass
+                np.logical_not(end, out=not_end)
+                env.reset_async(not_end)
+
+            # Agent observes the consequences. Note that rs, dones and resets
+            # may be reused in later steps, so agents must not keep them.
+            try:
+                agent.batch_observe_and_train(obss, rs, dones, resets)
+            finally:
+                # Receive observations even on errors so that no reset is
+                # left pending in the env
+                if resetting:
+                    obss = env.reset_wait()
 
             # For episodes that ends, do the following:
             #   1. increment the episode count
             #   2. record the return
             #   3. clear the record of rewards
             #   4. clear the record of the number of steps
-            #   5. reset the env to start a new episode
-            # 3-5 are skipped when training is already finished.
-            episode_idx += end
-            recent_returns.extend(episode_r[end])
-
-            for _ in range(num_envs):
-                t += 1
-                if checkpoint_freq and t % checkpoint_freq == 0:
-                    save_agent(agent, t, outdir, logger,
+            # Most steps end no episode, so skip all of them in that case.
+            if n_end:
+                total_episodes += n_end
+                for i in np.flatnonzero(end):
+                    recent_returns.append(episode_r[i])
+                    episode_r[i] = 0
+                    episode_len[i] = 0
+
+            t_start = t
+            t += num_envs
+            if t >= next_checkpoint_t:
+                for checkpoint_t in range(
+                        next_checkpoint_t, t + 1, checkpoint_freq):
+                    save_agent(agent, checkpoint_t, outdir, logger,
                                suffix='_checkpoint')
+                next_checkpoint_t = \
+                    (t // checkpoint_freq + 1) * checkpoint_freq
 
-                for hook in step_hooks:
-                    hook(env, agent, t)
+            for hook in batch_step_hooks:
+                hook(env, agent, t_start, t)
 
-            if (log_interval is not None
-                    and t >= log_interval
-                    and t % log_interval < num_envs):
-                logger.info(
-                    'outdir:{} step:{} episode:{} last_R: {} average_R:{}'.format(  # NOQA
+            if t >= next_log_t:
+                next_log_t = (t // log_interval + 1) * log_interval
+                # Statistics can be costly to compute, e.g. for GPU agents
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info(
+                        'outdir:%s step:%s episode:%s last_R: %s average_R:%s',  # NOQA
                         outdir,
                         t,
-                        np.sum(episode_idx),
-                        recent_returns[-1] if recent_returns else np.nan,
-                        np.mean(recent_returns) if recent_returns else np.nan,
-                    ))
-                logger.info('statistics: {}'.format(agent.get_statistics()))
+                        total_episodes,
+                        recent_returns.last() if recent_returns else np.nan,
+                        recent_returns.mean() if recent_returns else np.nan,
+                    )
+                    logger.info('statistics: %s', agent.get_statistics())
             if evaluator:
                 if evaluator.evaluate_if_necessary(
-                        t=t, episodes=np.sum(episode_idx)):
+                        t=t, episodes=total_episodes):
                     if (successful_score is not None and
                             evaluator.max_score >= successful_score):
                         break
@@ -116,11 +200,6 @@ def train_agent_batch(agent, env, steps, outdir,
             if t >= steps:
                 break
 
-            # Start new episodes if needed
-            episode_r[end] = 0
-            episode_len[end] = 0
-            obss = env.reset(not_end)
-
     except (Exception, KeyboardInterrupt):
         # Save the current model before being killed
         save_agent(agent, t, outdir, logger, suffix='_except')
@@ -174,8 +253,11 @@ def train_agent_batch_with_evaluation(agent,
         successful_score (float): Finish training if the mean score is greater
             or equal to thisvalue if not None
         step_hooks (Sequence): Sequence of callable objects that accepts
-            (env, agent, step) as arguments. They are called every step.
-            See chainerrl.experiments.hooks.
+            (env, agent, step) as arguments. They are called once every batch
+            step with the last timestep, or every timestep if they have the
+            attribute `wants_every_step` set to True. Hooks that must see
+            every timestep, e.g. ones that check `step % N == 0`, need to set
+            it. See chainerrl.experiments.hooks.
         save_best_so_far_agent (bool): If set to True, after each evaluation,
             if the score (= mean return of evaluation episodes) exceeds
             the best-so-far score, the current agent is saved.
@@ -24,9 +24,21 @@ class VectorEnvWrapper(VectorEnv):
     def step(self, action):
         return self.env.step(action)
 
+    def step_async(self, action):
+        self.env.step_async(action)
+
+    def step_wait(self):
+        return self.env.step_wait()
+
     def reset(self, **kwargs):
         return self.env.reset(**kwargs)
 
+    def reset_async(self, **kwargs):
+        self.env.reset_async(**kwargs)
+
+    def reset_wait(self):
+        return self.env.reset_wait()
+
     def render(self, mode='human', **kwargs):
         return self.env.render(mode, **kwargs)
 
@@ -80,6 +92,17 @@ class VectorFrameStack(VectorEnvWrapper):
 
     def reset(self, mask=None):
         batch_ob = self.env.reset(mask=mask)
+        return self._reset_frames(mask, batch_ob)
+
+    def reset_async(self, mask=None):
+        self.env.reset_async(mask=mask)
+        self._reset_mask = mask
+
+    def reset_wait(self):
+        batch_ob = self.env.reset_wait()
+        return self._reset_frames(self._reset_mask, batch_ob)
+
+    def _reset_frames(self, mask, batch_ob):
         if mask is None:
             mask = np.zeros(self.env.num_envs)
         for m, frames, ob in zip(mask, self.frames, batch_ob):
@@ -90,9 +113,16 @@ class VectorFrameStack(VectorEnvWrapper):
 
     def step(self, action):
         batch_ob, reward, done, info = self.env.step(action)
+        return self._stack_frames(batch_ob), reward, done, info
+
+    def step_wait(self):
+        batch_ob, reward, done, info = self.env.step_wait()
+        return self._stack_frames(batch_ob), reward, done, info
+
+    def _stack_frames(self, batch_ob):
         for frames, ob in zip(self.frames, batch_ob):
             frames.append(ob)
-        return self._get_ob(), reward, done, info
+        return self._get_ob()
 
     def _get_ob(self):
         assert len(self.frames) == self.env.num_envs
@@ -43,7 +43,7 @@ class TestSerialVectorEnv(unittest.TestCase):
         self.assertEqual(
             self.vec_env.observation_space, self.envs[0].observation_space)
 
-    def test_seed_reset_and_step(self):
+    def seed_and_reset(self):
         # seed
         seeds = [self.random_seed_offset + i for i in range(self.num_envs)]
         self.vec_env.seed(seeds)
@@ -55,6 +55,9 @@ class TestSerialVectorEnv(unittest.TestCase):
         real_obss = [env.reset() for env in self.envs]
         np.testing.assert_allclose(obss, real_obss)
 
+    def test_seed_reset_and_step(self):
+        self.seed_and_reset()
+
         # step
         actions = [env.action_space.sample() for env in self.envs]
         real_obss, real_rewards, real_dones, real_infos = zip(*[
@@ -80,5 +83,68 @@ class TestSerialVectorEnv(unittest.TestCase):
                 real_obss[i] = self.envs[i].reset()
         np.testing.assert_allclose(obss, real_obss)
 
+    def test_step_async_and_step_wait(self):
+        self.seed_and_reset()
+
+        # step_async and step_wait should be equivalent to step
+        actions = [env.action_space.sample() for env in self.envs]
+        real_obss, real_rewards, real_dones, real_infos = zip(*[
+            env.step(action) for env, action in zip(self.envs, actions)])
+        self.vec_env.step_async(actions)
+        obss, rewards, dones, infos = self.vec_env.step_wait()
+        np.testing.assert_allclose(obss, real_obss)
+        self.assertEqual(rewards, real_rewards)
+        self.assertEqual(dones, real_dones)
+        self.assertEqual(infos, real_infos)
+
+    def test_step_into(self):
+        self.seed_and_reset()
+
+        # step_into should be equivalent to step
+        actions = [env.action_space.sample() for env in self.envs]
+        real_obss, real_rewards, real_dones, real_infos = zip(*[
+            env.step(action) for env, action in zip(self.envs, actions)])
+        rewards = np.zeros(self.num_envs, dtype=np.float32)
+        dones = np.zeros(self.num_envs, dtype=bool)
+        obss, infos = self.vec_env.step_into(actions, rewards, dones)
+        np.testing.assert_allclose(obss, real_obss)
+        np.testing.assert_allclose(rewards, real_rewards)
+        np.testing.assert_array_equal(dones, real_dones)
+        self.assertEqual(tuple(infos), real_infos)
+
+    def test_reset_async_and_reset_wait(self):
+        self.seed_and_reset()
+
+        actions = [env.action_space.sample() for env in self.envs]
+        real_obss, _, _, _ = zip(*[
+            env.step(action) for env, action in zip(self.envs, actions)])
+        self.vec_env.step(actions)
+
+        # reset_async and reset_wait should be equivalent to reset
+        mask = np.zeros(self.num_envs)
+        mask[-1] = 1
+        self.vec_env.reset_async(mask)
+        obss = self.vec_env.reset_wait()
+        real_obss = list(real_obss)
+        for i in range(self.num_envs):
+            if not mask[i]:
+                real_obss[i] = self.envs[i].reset()
+        np.testing.assert_allclose(obss, real_obss)
+
+
+class TestVectorEnvWaitWithoutAsync(unittest.TestCase):
+
+    def test_step_wait_without_step_async(self):
+        vec_env = chainerrl.envs.SerialVectorEnv(
+            [gym.make('CartPole-v0') for _ in range(2)])
+        with self.assertRaises(RuntimeError):
+            vec_env.step_wait()
+
+    def test_reset_wait_without_reset_async(self):
+        vec_env = chainerrl.envs.SerialVectorEnv(
+            [gym.make('CartPole-v0') for _ in range(2)])
+        with self.assertRaises(RuntimeError):
+            vec_env.reset_wait()
+
 
 testing.run_module(__name__, __file__)
@@ -3,6 +3,7 @@ import unittest
 import numpy as np
 
 import chainerrl
+from chainerrl.experiments.hooks import BatchStepHook
 
 
 class TestLinearInterpolationHook(unittest.TestCase):
@@ -25,3 +26,68 @@ class TestLinearInterpolationHook(unittest.TestCase):
 
         np.testing.assert_allclose(
             buf, np.arange(1, 10 + 1, dtype=np.float32) / 10)
+
+    def test_batch_call(self):
+
+        buf = []
+
+        def setter(env, agent, value):
+            buf.append(value)
+
+        hook = chainerrl.experiments.LinearInterpolationHook(
+            total_steps=10,
+            start_value=0.1,
+            stop_value=1.0,
+            setter=setter)
+
+        # Called once with the value at the last timestep
+        hook.batch_call(env=None, agent=None, t_start=0, t_end=4)
+        hook.batch_call(env=None, agent=None, t_start=4, t_end=8)
+        np.testing.assert_allclose(buf, [0.4, 0.8])
+
+
+class TestBatchStepHook(unittest.TestCase):
+
+    def test_call(self):
+
+        buf = []
+
+        def hook(env, agent, step):
+            buf.append(step)
+
+        batch_hook = BatchStepHook(hook)
+        batch_hook(env=None, agent=None, t_start=0, t_end=4)
+        batch_hook(env=None, agent=None, t_start=4, t_end=8)
+        self.assertEqual(buf, [4, 8])
+
+    def test_call_every_step(self):
+
+        buf = []
+
+        def hook(env, agent, step):
+            buf.append(step)
+
+        hook.wants_every_step = True
+
+        batch_hook = BatchStepHook(hook)
+        batch_hook(env=None, agent=None, t_start=0, t_end=4)
+        batch_hook(env=None, agent=None, t_start=4, t_end=8)
+        self.assertEqual(buf, list(range(1, 8 + 1)))
+
+    def test_batch_call_precedence(self):
+
+        calls = []
+
+        class Hook(object):
+
+            wants_every_step = True
+
+            def __call__(self, env, agent, step):
+                calls.append(('__call__', step))
+
+            def batch_call(self, env, agent, t_start, t_end):
+                calls.append(('batch_call', t_start, t_end))
+
+        batch_hook = BatchStepHook(Hook())
+        batch_hook(env=None, agent=None, t_start=0, t_end=4)
+        self.assertEqual(calls, [('batch_call', 0, 4)])
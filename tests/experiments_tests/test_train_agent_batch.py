@@ -1,17 +1,24 @@
+import logging
 import math
+import os
+import re
 import tempfile
 import unittest
 from unittest import mock
 
+from chainer import cuda
 from chainer import testing
+import numpy as np
 
 import chainerrl
+from chainerrl.experiments.train_agent_batch import _RecentReturns
 
 
 @testing.parameterize(*testing.product({
     'num_envs': [1, 2],
     'max_episode_len': [None, 2],
     'steps': [5, 6],
+    'wants_every_step': [True, False],
 }))
 class TestTrainAgentBatch(unittest.TestCase):
 
@@ -46,7 +53,8 @@ class TestTrainAgentBatch(unittest.TestCase):
         vec_env = chainerrl.envs.SerialVectorEnv(
             [make_env() for _ in range(self.num_envs)])
 
-        hook = mock.Mock()
+        hook = mock.Mock(spec=['wants_every_step'])
+        hook.wants_every_step = self.wants_every_step
 
         chainerrl.experiments.train_agent_batch(
             agent=agent,
@@ -89,18 +97,159 @@ class TestTrainAgentBatch(unittest.TestCase):
                     assert False
             self.assertEqual(env.step.call_count, iters)
 
-        if steps % self.num_envs == 0:
-            self.assertEqual(hook.call_count, steps)
-        else:
+        if self.wants_every_step:
             self.assertEqual(hook.call_count, self.num_envs * iters)
+        else:
+            # Called once every batch step
+            self.assertEqual(hook.call_count, iters)
 
         # A hook receives (env, agent, step)
         for i, call in enumerate(hook.call_args_list):
             args, kwargs = call
             self.assertEqual(args[0], vec_env)
             self.assertEqual(args[1], agent)
-            # step starts with 1
-            self.assertEqual(args[2], i + 1)
+            if self.wants_every_step:
+                # step starts with 1
+                self.assertEqual(args[2], i + 1)
+            else:
+                # step is the last timestep of each batch step
+                self.assertEqual(args[2], (i + 1) * self.num_envs)
+
+
+class TestTrainAgentBatchStepHookEveryStep(unittest.TestCase):
+
+    def test_modulo_hook(self):
+        # num_envs does not divide the hook interval
+        num_envs = 3
+        interval = 4
+        steps = 12
+
+        outdir = tempfile.mkdtemp()
+
+        agent = mock.Mock()
+        agent.batch_act_and_train.side_effect = [[1] * num_envs] * 1000
+
+        def make_env():
+            env = mock.Mock()
+            env.reset.side_effect = [('state', 0)] * 1000
+            env.step.side_effect = [(('state', 1), 0, False, {})] * 1000
+            return env
+
+        vec_env = chainerrl.envs.SerialVectorEnv(
+            [make_env() for _ in range(num_envs)])
+
+        triggered_steps = []
+
+        def hook(env, agent, step):
+            if step % interval == 0:
+                triggered_steps.append(step)
+
+        hook.wants_every_step = True
+
+        chainerrl.experiments.train_agent_batch(
+            agent=agent,
+            env=vec_env,
+            steps=steps,
+            outdir=outdir,
+            step_hooks=[hook],
+        )
+
+        self.assertEqual(triggered_steps, [4, 8, 12])
+
+
+class TestTrainAgentBatchIntervals(unittest.TestCase):
+
+    def train(self, agent, outdir, steps, logger):
+        num_envs = 3
+        agent.batch_act_and_train.side_effect = [[1] * num_envs] * 1000
+
+        def make_env():
+            env = mock.Mock()
+            env.reset.side_effect = [('state', 0)] * 1000
+            env.step.side_effect = [(('state', 1), 0, False, {})] * 1000
+            return env
+
+        vec_env = chainerrl.envs.SerialVectorEnv(
+            [make_env() for _ in range(num_envs)])
+
+        # Neither interval is divisible by num_envs
+        chainerrl.experiments.train_agent_batch(
+            agent=agent,
+            env=vec_env,
+            steps=steps,
+            outdir=outdir,
+            checkpoint_freq=4,
+            log_interval=5,
+            logger=logger,
+        )
+
+    def test_checkpoint_and_log(self):
+        steps = 24
+        outdir = tempfile.mkdtemp()
+        agent = mock.Mock()
+        logger = mock.Mock()
+        self.train(agent, outdir, steps, logger)
+
+        # Every multiple of checkpoint_freq is saved
+        saved_dirnames = [args[0] for args, _ in agent.save.call_args_list]
+        self.assertEqual(
+            saved_dirnames,
+            [os.path.join(outdir, '{}_checkpoint'.format(t))
+             for t in range(4, steps + 1, 4)]
+            + [os.path.join(outdir, '{}_finish'.format(steps))])
+
+        # Logged after t=6, 12, 15 and 21, i.e., when t passes a multiple of
+        # log_interval
+        log_messages = [
+            args[0] % args[1:] for args, _ in logger.info.call_args_list]
+        log_steps = [
+            int(re.search(r'step:(\d+)', message).group(1))
+            for message in log_messages if message.startswith('outdir:')]
+        self.assertEqual(log_steps, [6, 12, 15, 21])
+
+    def test_log_disabled(self):
+        outdir = tempfile.mkdtemp()
+        agent = mock.Mock()
+        logger = logging.getLogger('test_train_agent_batch')
+        logger.setLevel(logging.WARNING)
+        self.train(agent, outdir, 24, logger)
+        # Statistics are not computed when they are not logged
+        self.assertEqual(agent.get_statistics.call_count, 0)
+
+
+class TestTrainAgentBatchGPUActions(unittest.TestCase):
+
+    @testing.attr.gpu
+    def test_actions_on_gpu(self):
+        num_envs = 2
+        steps = 4
+
+        outdir = tempfile.mkdtemp()
+
+        agent = mock.Mock()
+        agent.batch_act_and_train.side_effect = [
+            cuda.cupy.ones(num_envs, dtype=np.int32)] * 1000
+
+        def make_env():
+            env = mock.Mock()
+            env.reset.side_effect = [('state', 0)] * 1000
+            env.step.side_effect = [(('state', 1), 0, False, {})] * 1000
+            return env
+
+        vec_env = chainerrl.envs.SerialVectorEnv(
+            [make_env() for _ in range(num_envs)])
+
+        chainerrl.experiments.train_agent_batch(
+            agent=agent,
+            env=vec_env,
+            steps=steps,
+            outdir=outdir,
+        )
+
+        # Envs receive actions on CPU
+        for env in vec_env.envs:
+            for args, _ in env.step.call_args_list:
+                self.assertIsInstance(args[0], np.int32)
 
 
 class TestTrainAgentBatchNeedsReset(unittest.TestCase):
@@ -145,14 +294,35 @@ class TestTrainAgentBatchNeedsReset(unittest.TestCase):
         vec_env = chainerrl.envs.SerialVectorEnv(
             [make_env(i) for i in range(2)])
 
-        chainerrl.experiments.train_agent_batch(
-            agent=agent,
-            env=vec_env,
-            steps=steps,
-            outdir=outdir,
-        )
+        with mock.patch.object(
+                vec_env, 'reset', wraps=vec_env.reset) as vec_env_reset:
+            chainerrl.experiments.train_agent_batch(
+                agent=agent,
+                env=vec_env,
+                steps=steps,
+                outdir=outdir,
+            )
+
+        # In the beginning and after 1, 2 and 3 iterations. After 4
+        # iterations no episode ends, so the vector env is not reset.
+        self.assertEqual(vec_env_reset.call_count, 4)
 
         self.assertEqual(vec_env.envs[0].reset.call_count, 2)
         self.assertEqual(vec_env.envs[0].step.call_count, 5)
         self.assertEqual(vec_env.envs[1].reset.call_count, 3)
         self.assertEqual(vec_env.envs[1].step.call_count, 5)
+
+
+class TestRecentReturns(unittest.TestCase):
+
+    def test(self):
+        recent_returns = _RecentReturns(maxlen=3)
+        self.assertEqual(len(recent_returns), 0)
+        self.assertFalse(recent_returns)
+        values = [1.0, -2.0, 0.5, 3.0, 4.5]
+        for i, value in enumerate(values):
+            recent_returns.append(value)
+            window = values[max(0, i - 2):i + 1]
+            self.assertEqual(len(recent_returns), len(window))
+            self.assertEqual(recent_returns.last(), value)
+            np.testing.assert_allclose(recent_returns.mean(), np.mean(window))
@@ -121,3 +121,72 @@ class TestVectorFrameStack(unittest.TestCase):
                     np.asarray(vfs_new_obs[env_idx]))
             np.testing.assert_allclose(fs_r, vfs_r)
             np.testing.assert_allclose(fs_done, vfs_done)
+
+
+@testing.parameterize(*testing.product({
+    'vector_env': ['SerialVectorEnv', 'MultiprocessVectorEnv'],
+}))
+class TestVectorFrameStackStepAsync(unittest.TestCase):
+
+    def test(self):
+
+        num_envs = 2
+        k = 3
+        steps = 5
+
+        def make_env(idx):
+            env = mock.Mock()
+            np_random = np.random.RandomState(idx)
+            env.reset.side_effect = [np_random.rand(1, 84, 84)]
+            env.step.side_effect = [
+                (np_random.rand(1, 84, 84), np_random.rand(), False, {})
+                for _ in range(steps)]
+            env.action_space = gym.spaces.Discrete(2)
+            env.observation_space = gym.spaces.Box(
+                low=0, high=255, shape=(1, 84, 84), dtype=np.uint8)
+            return env
+
+        def make_vfs_env():
+            env_fns = [functools.partial(make_env, idx)
+                       for idx in range(num_envs)]
+            if self.vector_env == 'SerialVectorEnv':
+                vec_env = chainerrl.envs.SerialVectorEnv(
+                    [env_fn() for env_fn in env_fns])
+            else:
+                vec_env = chainerrl.envs.MultiprocessVectorEnv(env_fns)
+            return VectorFrameStack(vec_env, k=k, stack_axis=0)
+
+        # The async API and step_into should be equivalent to step and reset
+        sync_env = make_vfs_env()
+        async_env = make_vfs_env()
+        sync_obs = sync_env.reset()
+        async_env.reset_async()
+        async_obs = async_env.reset_wait()
+        for env_idx in range(num_envs):
+            self.assertIsInstance(async_obs[env_idx], LazyFrames)
+            np.testing.assert_allclose(
+                np.asarray(sync_obs[env_idx]),
+                np.asarray(async_obs[env_idx]))
+        into_env = make_vfs_env()
+        into_env.reset()
+        into_r = np.zeros(num_envs, dtype=np.float32)
+        into_done = np.zeros(num_envs, dtype=bool)
+        batch_action = [0] * num_envs
+        for _ in range(steps):
+            sync_obs, sync_r, sync_done, _ = sync_env.step(batch_action)
+            async_env.step_async(batch_action)
+            async_obs, async_r, async_done, _ = async_env.step_wait()
+            into_obs, _ = into_env.step_into(batch_action, into_r, into_done)
+            for env_idx in range(num_envs):
+                self.assertIsInstance(async_obs[env_idx], LazyFrames)
+                self.assertIsInstance(into_obs[env_idx], LazyFrames)
+                np.testing.assert_allclose(
+                    np.asarray(sync_obs[env_idx]),
+                    np.asarray(async_obs[env_idx]))
+                np.testing.assert_allclose(
+                    np.asarray(sync_obs[env_idx]),
+                    np.asarray(into_obs[env_idx]))
+            np.testing.assert_allclose(sync_r, async_r)
+            np.testing.assert_allclose(sync_done, async_done)
+            np.testing.assert_allclose(sync_r, into_r, rtol=1e-6)
+            np.testing.assert_array_equal(sync_done, into_done)